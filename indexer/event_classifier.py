@@ -9,8 +9,10 @@ import sys
 import time
 import traceback
 import codecs
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional, List, Tuple, Set, Dict
+from typing import Optional, List, Tuple, Set, Dict, Awaitable
 from dataclasses import asdict
 import json
 from collections import defaultdict
@@ -37,7 +39,7 @@ from indexer.events.blocks.utils.address_selectors import extract_additional_add
 from indexer.events.blocks.utils.block_tree_serializer import block_to_action
 from indexer.events.blocks.utils.dedust_pools import init_pools_data
 from indexer.events.blocks.utils.block_tree_serializer import block_to_action, serialize_blocks
-from indexer.events.blocks.utils.event_deserializer import deserialize_event
+from indexer.events.blocks.utils.event_deserializer import deserialize_event, collect_trace_accounts
 from indexer.events.event_processing import process_event_async, process_event_async_with_postprocessing
 from indexer.events.interface_repository import EmulatedTransactionsInterfaceRepository, gather_interfaces, \
     RedisInterfaceRepository, EmulatedRepositoryWithDbFallback
@@ -48,6 +50,7 @@ logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 logger = logging.getLogger(__name__)
 settings = Settings()
 interface_cache: LRUCache | None = None
+emulated_traces_executor: ProcessPoolExecutor | None = None
 
 
 class ClassifierTask(Base):
@@ -416,10 +419,14 @@ async def start_processing_events_from_db(args: argparse.Namespace):
 
 async def start_emulated_traces_processing(batch_window: float = 0.1, max_batch_size: int = 50):
     global interface_cache
+    global emulated_traces_executor
 
     # Initialize the global interface cache
     interface_cache = LRUCache(max_size=settings.interfaces_cache_size, ttl=settings.interfaces_cache_ttl)
 
+    # Traces in a batch are independent, so they can be classified in worker processes
+    emulated_traces_executor = create_emulated_traces_executor()
+
     pubsub = redis.client.pubsub()
     await pubsub.subscribe(settings.emulated_traces_redis_channel)
 
@@ -435,6 +442,7 @@ async def start_emulated_traces_processing(batch_window: float = 0.1, max_batch_
     logger.info(f"  Max batch size: {max_batch_size} traces")
     logger.info(f"  Interface cache size: {interface_cache.max_size} entries")
     logger.info(f"  Interface cache TTL: {interface_cache.ttl} seconds")
+    logger.info(f"  Worker pool size: {settings.emulated_traces_pool_size}")
 
     try:
         while True:
@@ -478,6 +486,8 @@ async def start_emulated_traces_processing(batch_window: float = 0.1, max_batch_
         logger.exception(e)
     finally:
         await pubsub.unsubscribe()
+        if emulated_traces_executor is not None:
+            emulated_traces_executor.shutdown(cancel_futures=True)
         logger.info("Emulated trace processing stopped")
 
 
@@ -513,16 +523,143 @@ async def get_interfaces_with_cache(accounts: Set[str], session: AsyncSession) -
         return cached_accounts
 
 
+def collect_emulated_trace_accounts(trace: Trace) -> Set[str]:
+    accounts = set()
+    for tx in trace.transactions:
+        accounts.add(tx.account)
+        accounts.update(extract_additional_addresses(tx))
+    return accounts
+
+
+async def classify_emulated_trace(
+        trace: Trace,
+        trace_map: Dict[str, bytes],
+        db_interfaces: Optional[Dict[str, Dict[str, Dict]]] = None
+) -> Tuple[bytes, Dict[str, Set[Tuple[str, int]]], Set[str], float]:
+    """Classifies one emulated trace.
+
+    Returns packed actions, the account -> actions index, transaction accounts and processing time.
+    Only plain data is returned, so the result is cheap to send back from a worker process."""
+    start = time.time()
+
+    # Setup repositories
+    emulated_repository = EmulatedTransactionsInterfaceRepository(trace_map)
+    if db_interfaces is not None:
+        repository = EmulatedRepositoryWithDbFallback(
+            emulated_repository=emulated_repository,
+            db_interfaces=db_interfaces,
+        )
+    else:
+        repository = emulated_repository
+    context.interface_repository.set(repository)
+
+    # Process trace
+    blocks = await process_event_async_with_postprocessing(trace)
+    actions, _ = serialize_blocks(blocks, trace.trace_id)
+    action_data = msgpack.packb([a.to_dict() for a in actions])
+
+    # Build index
+    index = defaultdict(set)
+    for action in actions:
+        for account in action.get_action_accounts():
+            k = f"{action.trace_id}:{action.action_id}"
+            v = trace.start_lt
+            index[account.account].add((k, v))
+
+    transaction_accounts = set(t.account for t in trace.transactions)
+    return action_data, dict(index), transaction_accounts, time.time() - start
+
+
+async def classify_packed_emulated_trace(
+        trace_id: str,
+        trace_map: Dict[str, bytes],
+        db_interfaces: Optional[Dict[str, Dict[str, Dict]]] = None
+) -> Tuple[bytes, Dict[str, Set[Tuple[str, int]]], Set[str], float]:
+    return await classify_emulated_trace(deserialize_event(trace_id, trace_map), trace_map, db_interfaces)
+
+
+def _classify_in_worker(trace_id: str, trace_map: Dict[str, bytes],
+                        db_interfaces: Optional[Dict[str, Dict[str, Dict]]]):
+    return asyncio.run(classify_packed_emulated_trace(trace_id, trace_map, db_interfaces))
+
+
+def create_emulated_traces_executor() -> Optional[ProcessPoolExecutor]:
+    if settings.emulated_traces_pool_size <= 0:
+        return None
+    return ProcessPoolExecutor(max_workers=settings.emulated_traces_pool_size, mp_context=mp.get_context('fork'))
+
+
+async def classify_emulated_trace_in_pool(
+        trace_id: str,
+        trace_map: Dict[str, bytes],
+        db_interfaces: Optional[Dict[str, Dict[str, Dict]]] = None
+) -> Tuple[bytes, Dict[str, Set[Tuple[str, int]]], Set[str], float]:
+    """Classifies one emulated trace in the worker pool.
+
+    If the pool is broken (e.g. a worker was killed), it is recreated and the trace is classified in this process."""
+    global emulated_traces_executor
+    executor = emulated_traces_executor
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, _classify_in_worker, trace_id, trace_map, db_interfaces)
+    except BrokenProcessPool:
+        # every pending trace of the batch fails the same way, only the first one replaces the pool
+        if emulated_traces_executor is executor:
+            logger.error("Emulated traces worker pool is broken, recreating it")
+            executor.shutdown(wait=False, cancel_futures=True)
+            emulated_traces_executor = create_emulated_traces_executor()
+        return await classify_packed_emulated_trace(trace_id, trace_map, db_interfaces)
+
+
+async def store_emulated_trace_result(
+        trace_id: str,
+        classification: Awaitable[Tuple[bytes, Dict[str, Set[Tuple[str, int]]], Set[str], float]]
+) -> Tuple[str, bool]:
+    """Waits for the classification of one trace and writes its results to Redis right away."""
+    try:
+        action_data, index, transaction_accounts, processing_time = await classification
+
+        # Store results in Redis
+        await redis.client.hset(trace_id, 'actions', action_data)
+        logger.info(f"Processed trace {trace_id} in {processing_time:.3f} seconds")
+
+        # Publish completion if configured
+        if settings.emulated_traces_redis_response_channel:
+            await redis.client.publish(
+                settings.emulated_traces_redis_response_channel,
+                trace_id
+            )
+
+        # Store referenced accounts
+        referenced_accounts = set(index.keys()) - transaction_accounts
+
+        # Add indices to Redis
+        for account, values in index.items():
+            await redis.client.zadd(f"_aai:{account}", dict(values))
+
+        # Publish referenced accounts
+        for r in referenced_accounts:
+            await redis.client.publish('referenced_accounts', f"{r};{trace_id}")
+
+        return trace_id, True
+
+    except Exception as e:
+        logger.error(f"Failed to process emulated trace {trace_id}: {e}")
+        logger.exception(e)
+        return trace_id, False
+
+
 async def process_emulated_trace_batch(
         trace_ids: List[str],
         session: AsyncSession,
         use_combined: bool = False
 ) -> List[Tuple[str, bool]]:
     results = []
+    use_pool = emulated_traces_executor is not None
 
-    all_accounts = set()
-    traces_data = {}
-
+    traces = {}
+    trace_maps = {}
+    trace_accounts = {}
     for trace_id in trace_ids:
         try:
             trace_map = await redis.client.hgetall(trace_id)
@@ -533,90 +670,50 @@ async def process_emulated_trace_batch(
                 results.append((trace_id, False))
                 continue
 
-            trace = deserialize_event(trace_id, trace_map)
-            traces_data[trace_id] = (trace, trace_map)
-
-            for tx in trace.transactions:
-                all_accounts.add(tx.account)
-                all_accounts.update(extract_additional_addresses(tx))
+            # Workers deserialize their traces themselves, here only the accounts are read from the payloads
+            if not use_pool:
+                traces[trace_id] = deserialize_event(trace_id, trace_map)
+                if use_combined:
+                    trace_accounts[trace_id] = collect_emulated_trace_accounts(traces[trace_id])
+            elif use_combined:
+                trace_accounts[trace_id] = collect_trace_accounts(trace_id, trace_map)
+            trace_maps[trace_id] = trace_map
 
         except Exception as e:
             logger.error(f"Failed to extract accounts from trace {trace_id}: {e}")
             results.append((trace_id, False))
 
     # Gather interfaces
-    db_interfaces = {}
-    if use_combined and all_accounts:
-        try:
-            logger.debug(f"Getting interfaces for {len(all_accounts)} accounts")
-            # Use our cached interface function that uses the global cache
-            db_interfaces = await get_interfaces_with_cache(all_accounts, session)
-            logger.debug(f"Got interfaces for {len(db_interfaces)} accounts")
-        except Exception as e:
-            logger.error(f"Failed to gather interfaces: {e}")
-            # Continue with empty db_interfaces
+    db_interfaces = None
+    if use_combined:
+        db_interfaces = {}
+        all_accounts = set().union(*trace_accounts.values())
+        if all_accounts:
+            try:
+                logger.debug(f"Getting interfaces for {len(all_accounts)} accounts")
+                # Use our cached interface function that uses the global cache
+                db_interfaces = await get_interfaces_with_cache(all_accounts, session)
+                logger.debug(f"Got interfaces for {len(db_interfaces)} accounts")
+            except Exception as e:
+                logger.error(f"Failed to gather interfaces: {e}")
+                # Continue with empty db_interfaces
 
     # Process traces
-    for trace_id, (trace, trace_map) in traces_data.items():
-        try:
-            start = time.time()
-
-            # Setup repositories
-            emulated_repository = EmulatedTransactionsInterfaceRepository(trace_map)
-            if use_combined:
-                repository = EmulatedRepositoryWithDbFallback(
-                    emulated_repository=emulated_repository,
-                    db_interfaces=db_interfaces,
-                )
-            else:
-                repository = emulated_repository
-            context.interface_repository.set(repository)
-
-            # Process trace
-            blocks = await process_event_async_with_postprocessing(trace)
-            actions, _ = serialize_blocks(blocks, trace_id)
-
-            # Store results in Redis
-            action_data = msgpack.packb([a.to_dict() for a in actions])
-            await redis.client.hset(trace_id, 'actions', action_data)
-
-            processing_time = time.time() - start
-            logger.info(f"Processed trace {trace_id} in {processing_time:.3f} seconds")
-
-            # Publish completion if configured
-            if settings.emulated_traces_redis_response_channel:
-                await redis.client.publish(
-                    settings.emulated_traces_redis_response_channel,
-                    trace_id
-                )
-
-            # Build index
-            index = defaultdict(set)
-            for action in actions:
-                for account in action.get_action_accounts():
-                    k = f"{action.trace_id}:{action.action_id}"
-                    v = trace.start_lt
-                    index[account.account].add((k, v))
-
-            # Store referenced accounts
-            transaction_accounts = set(t.account for t in trace.transactions)
-            referenced_accounts = set(index.keys()) - transaction_accounts
-
-            # Add indices to Redis
-            for account, values in index.items():
-                await redis.client.zadd(f"_aai:{account}", dict(values))
-
-            # Publish referenced accounts
-            for r in referenced_accounts:
-                await redis.client.publish('referenced_accounts', f"{r};{trace_id}")
-
-            results.append((trace_id, True))
-
-        except Exception as e:
-            logger.error(f"Failed to process emulated trace {trace_id}: {e}")
-            logger.exception(e)
-            results.append((trace_id, False))
-
+    if not use_pool:
+        for trace_id, trace in traces.items():
+            classification = classify_emulated_trace(trace, trace_maps[trace_id], db_interfaces)
+            results.append(await store_emulated_trace_result(trace_id, classification))
+        return results
+
+    tasks = []
+    for trace_id, trace_map in trace_maps.items():
+        trace_interfaces = None
+        if db_interfaces is not None:
+            # Each trace only gets interfaces of its own accounts to keep worker payloads small
+            trace_interfaces = {a: db_interfaces[a] for a in trace_accounts[trace_id] if a in db_interfaces}
+        classification = classify_emulated_trace_in_pool(trace_id, trace_map, trace_interfaces)
+        tasks.append(store_emulated_trace_result(trace_id, classification))
+    results.extend(await asyncio.gather(*tasks))
     return results
 
 async def start_emulated_task_traces_processing():
@@ -712,12 +809,17 @@ if __name__ == '__main__':
                         help='Batch time window in seconds. Used to batch emulated traces',
                         default=0.1,
                         type=float)
+    parser.add_argument('--emulated-traces-pool-size',
+                        help='Number of worker processes to classify emulated traces with (0 - classify in main process)',
+                        default=0,
+                        type=int)
     args = parser.parse_args()
 
     settings.emulated_traces_redis_channel = args.emulated_traces_redis_channel
     settings.emulated_traces_redis_response_channel = args.emulated_traces_redis_response_channel
     settings.emulated_traces = args.emulated_traces
     settings.use_combined_repository = args.use_combined_repository
+    settings.emulated_traces_pool_size = args.emulated_traces_pool_size
 
     if args.emulated_trace_tasks:
         logger.info("Starting processing emulated trace tasks")
@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     interfaces_cache_size: int = 10000
     interfaces_cache_ttl: int = 300
     use_combined_repository: bool = False
+    emulated_traces_pool_size: int = 0
 
     class Config:
         env_prefix = 'ton_indexer_'
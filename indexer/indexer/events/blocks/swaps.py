@@ -222,7 +222,7 @@ class StonfiV2SwapBlockMatcher(BlockMatcher):
 
     async def _get_target_asset_from_notification(self, message: Message):
         try:
-            address = next(iter(extract_target_wallet_stonfi_v2_swap(message)), None)
+            address = next(iter(extract_target_wallet_stonfi_v2_swap(message.message_content.body)), None)
             if address is None:
                 return None
             jetton_wallet = await context.interface_repository.get().get_jetton_wallet(address)
@@ -1,11 +1,11 @@
 from pytoniq_core import Slice
 
-from indexer.core.database import Message, Transaction
+from indexer.core.database import Transaction
 from indexer.events.blocks.messages import JettonNotify, JettonTransfer, StonfiSwapV2
 
-def extract_target_wallet_stonfi_v2_swap(message: Message) -> set[str]:
+def extract_target_wallet_stonfi_v2_swap(body: str) -> set[str]:
     accounts = set()
-    slice = Slice.one_from_boc(message.message_content.body)
+    slice = Slice.one_from_boc(body)
     slice.skip_bits(32 + 64)  # opcode + query_id
     slice.load_coins()
     slice.load_address()
@@ -17,32 +17,37 @@ def extract_target_wallet_stonfi_v2_swap(message: Message) -> set[str]:
             accounts.add(address.to_str(False).upper())
     return accounts
 
-def extract_target_wallet_stonfi_swap(message: Message) -> set[str]:
+def extract_target_wallet_stonfi_swap(body: str) -> set[str]:
     accounts = set()
-    jetton_transfer = JettonTransfer(Slice.one_from_boc(message.message_content.body))
+    jetton_transfer = JettonTransfer(Slice.one_from_boc(body))
     if jetton_transfer.stonfi_swap_body:
         accounts.add(jetton_transfer.stonfi_swap_body['jetton_wallet'].to_str(is_user_friendly=False).upper())
     return accounts
 
-def extract_pool_wallets_stonfi_v2(message: Message) -> set[str]:
+def extract_pool_wallets_stonfi_v2(body: str) -> set[str]:
     accounts = set()
-    stonfi_swap_msg = StonfiSwapV2(Slice.one_from_boc(message.message_content.body))
+    stonfi_swap_msg = StonfiSwapV2(Slice.one_from_boc(body))
     accounts.update(stonfi_swap_msg.get_pool_accounts_recursive())
     return accounts
 
+def extract_message_additional_addresses(opcode: int | None, body: str) -> set[str]:
+    accounts = set()
+    if opcode is None:
+        return accounts
+    opcode = opcode & 0xFFFFFFFF
+    try:
+        if opcode == JettonTransfer.opcode:
+            accounts.update(extract_target_wallet_stonfi_swap(body))
+        if opcode == JettonNotify.opcode:
+            accounts.update(extract_target_wallet_stonfi_v2_swap(body))
+        if opcode == StonfiSwapV2.opcode:
+            accounts.update(extract_pool_wallets_stonfi_v2(body))
+    except Exception:
+        pass
+    return accounts
+
 def extract_additional_addresses(tx: Transaction) -> set[str]:
     accounts = set()
     for msg in tx.messages:
-        if msg.opcode is None:
-            continue
-        opcode = msg.opcode & 0xFFFFFFFF
-        try:
-            if opcode == JettonTransfer.opcode:
-                accounts.update(extract_target_wallet_stonfi_swap(msg))
-            if opcode == JettonNotify.opcode:
-                accounts.update(extract_target_wallet_stonfi_v2_swap(msg))
-            if opcode == StonfiSwapV2.opcode:
-                accounts.update(extract_pool_wallets_stonfi_v2(msg))
-        except Exception:
-            pass
+        accounts.update(extract_message_additional_addresses(msg.opcode, msg.message_content.body))
     return accounts
\ No newline at end of file
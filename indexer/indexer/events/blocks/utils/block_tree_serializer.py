@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-import base64
-import hashlib
 import logging
+from hashlib import sha256
+from operator import methodcaller
+from typing import Callable
+
+from pybase64 import b64encode
 
 from indexer.core.database import Action, Trace
 from indexer.events.blocks.basic_blocks import CallContractBlock, TonTransferBlock
@@ -25,6 +28,8 @@ from indexer.events.blocks.utils import AccountId, Asset
 
 logger = logging.getLogger(__name__)
 
+_get_lt = methodcaller('get_lt')
+
 def _addr(addr: AccountId | Asset | None) -> str | None:
     if addr is None:
         return None
@@ -35,20 +40,21 @@ def _addr(addr: AccountId | Asset | None) -> str | None:
 
 
 def _calc_action_id(block: Block) -> str:
-    root_event_node = min(block.event_nodes, key=lambda n: n.get_lt())
+    event_nodes = block.event_nodes
+    root_event_node = event_nodes[0] if len(event_nodes) == 1 else min(event_nodes, key=_get_lt)
     key = ""
     if root_event_node.message is not None:
         key = root_event_node.message.msg_hash
     else:
         key = root_event_node.get_tx_hash()
     key += block.btype
-    h = hashlib.sha256(key.encode())
-    return base64.b64encode(h.digest()).decode()
+    # hashlib's sha256 is backed by OpenSSL, which already dispatches to SHA-NI when available
+    return b64encode(sha256(key.encode()).digest()).decode('ascii')
 
 
 def _base_block_to_action(block: Block, trace_id: str) -> Action:
     action_id = _calc_action_id(block)
-    tx_hashes = list(set(n.get_tx_hash() for n in block.event_nodes))
+    tx_hashes = list(dict.fromkeys(n.get_tx_hash() for n in block.event_nodes))
     mc_seqno_end = max(n.get_tx().mc_block_seqno for n in block.event_nodes if n.get_tx() is not None)
     accounts = []
     for n in block.event_nodes:
@@ -75,11 +81,12 @@ def _base_block_to_action(block: Block, trace_id: str) -> Action:
 
 
 def _fill_call_contract_action(block: CallContractBlock, action: Action):
+    d = block.data
     action.opcode = block.opcode
-    action.value = block.data['value'].value
-    action.source = block.data['source'].as_str() if block.data['source'] is not None else None
-    action.destination = block.data['destination'].as_str() if block.data['destination'] is not None else None
-    extra_currencies = block.data['extra_currencies'] if 'extra_currencies' in block.data else None
+    action.value = d['value'].value
+    action.source = d['source'].as_str() if d['source'] is not None else None
+    action.destination = d['destination'].as_str() if d['destination'] is not None else None
+    extra_currencies = d['extra_currencies'] if 'extra_currencies' in d else None
     if extra_currencies is not None:
         action.value_extra_currencies = extra_currencies
     else:
@@ -87,14 +94,17 @@ def _fill_call_contract_action(block: CallContractBlock, action: Action):
 
 
 def _fill_ton_transfer_action(block: TonTransferBlock, action: Action):
+    d = block.data
     action.value = block.value
-    action.source = block.data['source'].as_str()
-    if block.data['destination'] is None:
-        print("Something very wrong", block.event_nodes[0].message.trace_id)
-    action.destination = block.data['destination'].as_str()
-    content = block.data['comment'].replace("\u0000", "") if block.data['comment'] is not None else None
-    action.ton_transfer_data = {'content': content, 'encrypted': block.data['encrypted']}
-    extra_currencies = block.data['extra_currencies'] if 'extra_currencies' in block.data else None
+    action.source = d['source'].as_str()
+    if d['destination'] is None:
+        logger.warning("ton_transfer without destination in trace %s", block.event_nodes[0].message.trace_id)
+    action.destination = d['destination'].as_str()
+    content = d['comment']
+    if content is not None and "\u0000" in content:
+        content = content.replace("\u0000", "")
+    action.ton_transfer_data = {'content': content, 'encrypted': d['encrypted']}
+    extra_currencies = d['extra_currencies'] if 'extra_currencies' in d else None
     if extra_currencies is not None:
         action.value_extra_currencies = extra_currencies
     else:
@@ -102,63 +112,68 @@ def _fill_ton_transfer_action(block: TonTransferBlock, action: Action):
 
 
 def _fill_jetton_transfer_action(block: JettonTransferBlock, action: Action):
-    action.source = block.data['sender'].as_str()
-    action.source_secondary = block.data['sender_wallet'].as_str()
-    action.destination = block.data['receiver'].as_str()
-    action.destination_secondary = block.data['receiver_wallet'].as_str() if 'receiver_wallet' in block.data else None
-    action.amount = block.data['amount'].value
-    asset = block.data['asset']
+    d = block.data
+    action.source = d['sender'].as_str()
+    action.source_secondary = d['sender_wallet'].as_str()
+    action.destination = d['receiver'].as_str()
+    action.destination_secondary = d['receiver_wallet'].as_str() if 'receiver_wallet' in d else None
+    action.amount = d['amount'].value
+    asset = d['asset']
     if asset is None or asset.is_ton:
         action.asset = None
     else:
         action.asset = asset.jetton_address.as_str()
-    comment = None
-    if block.data['comment'] is not None:
-        if block.data['encrypted_comment']:
-            comment = base64.b64encode(block.data['comment']).decode('utf-8')
+    comment = d['comment']
+    if comment is not None:
+        if d['encrypted_comment']:
+            comment = b64encode(comment).decode('utf-8')
         else:
-            comment = block.data['comment'].decode('utf-8', errors='backslashreplace').replace("\u0000", "")
+            comment = comment.decode('utf-8', errors='backslashreplace')
+            if "\u0000" in comment:
+                comment = comment.replace("\u0000", "")
     action.jetton_transfer_data = {
-        'query_id': block.data['query_id'],
-        'response_destination': block.data['response_address'].as_str() if block.data[
-                                                                           'response_address'] is not None else None,
-        'forward_amount': block.data['forward_amount'].value,
-        'custom_payload': block.data['custom_payload'],
-        'forward_payload': block.data['forward_payload'],
+        'query_id': d['query_id'],
+        'response_destination': d['response_address'].as_str() if d['response_address'] is not None else None,
+        'forward_amount': d['forward_amount'].value,
+        'custom_payload': d['custom_payload'],
+        'forward_payload': d['forward_payload'],
         'comment': comment,
-        'is_encrypted_comment': block.data['encrypted_comment']
+        'is_encrypted_comment': d['encrypted_comment']
     }
 
 
 def _fill_nft_transfer_action(block: NftTransferBlock, action: Action):
-    if 'prev_owner' in block.data and block.data['prev_owner'] is not None:
-        action.source = block.data['prev_owner'].as_str()
-    action.destination = block.data['new_owner'].as_str()
-    action.asset_secondary = block.data['nft']['address'].as_str()
-    if block.data['nft']['collection'] is not None:
-        action.asset = block.data['nft']['collection']['address'].as_str()
+    d = block.data
+    if 'prev_owner' in d and d['prev_owner'] is not None:
+        action.source = d['prev_owner'].as_str()
+    action.destination = d['new_owner'].as_str()
+    nft = d['nft']
+    action.asset_secondary = nft['address'].as_str()
+    if nft['collection'] is not None:
+        action.asset = nft['collection']['address'].as_str()
     action.nft_transfer_data = {
-        'query_id': block.data['query_id'],
-        'is_purchase': block.data['is_purchase'],
-        'price': block.data['price'].value if 'price' in block.data and block.data['is_purchase'] else None,
-        'nft_item_index': block.data['nft']['index'],
-        'forward_amount': block.data['forward_amount'].value if block.data['forward_amount'] is not None else None,
-        'custom_payload': block.data['custom_payload'],
-        'forward_payload': block.data['forward_payload'],
-        'response_destination': block.data['response_destination'].as_str() if block.data['response_destination'] else None,
+        'query_id': d['query_id'],
+        'is_purchase': d['is_purchase'],
+        'price': d['price'].value if 'price' in d and d['is_purchase'] else None,
+        'nft_item_index': nft['index'],
+        'forward_amount': d['forward_amount'].value if d['forward_amount'] is not None else None,
+        'custom_payload': d['custom_payload'],
+        'forward_payload': d['forward_payload'],
+        'response_destination': d['response_destination'].as_str() if d['response_destination'] else None,
     }
 
 
 def _fill_nft_mint_action(block: NftMintBlock, action: Action):
-    if block.data["source"]:
-        action.source = block.data["source"].as_str()
-    action.destination = block.data["address"].as_str()
+    d = block.data
+    if d["source"]:
+        action.source = d["source"].as_str()
+    action.destination = d["address"].as_str()
     action.asset_secondary = action.destination
-    action.opcode = block.data['opcode']
-    if block.data["collection"]:
-        action.asset = block.data["collection"].as_str()
+    action.opcode = d['opcode']
+    if d["collection"]:
+        action.asset = d["collection"].as_str()
     action.nft_mint_data = {
-        'nft_item_index': block.data["index"],
+        'nft_item_index': d["index"],
     }
 
 
@@ -173,97 +188,100 @@ def _convert_peer_swap(peer_swap: dict) -> dict:
     }
 
 
-def _fill_jetton_swap_action(block: JettonSwapBlock, action: Action):
-    dex_incoming_transfer = {
-        'amount': block.data['dex_incoming_transfer']['amount'].value,
-        'source': _addr(block.data['dex_incoming_transfer']['source']),
-        'source_jetton_wallet': _addr(block.data['dex_incoming_transfer']['source_jetton_wallet']),
-        'destination': _addr(block.data['dex_incoming_transfer']['destination']),
-        'destination_jetton_wallet': _addr(block.data['dex_incoming_transfer']['destination_jetton_wallet']),
-        'asset': _addr(block.data['dex_incoming_transfer']['asset'])
-    }
-    dex_outgoing_transfer = {
-        'amount': block.data['dex_outgoing_transfer']['amount'].value,
-        'source': _addr(block.data['dex_outgoing_transfer']['source']),
-        'source_jetton_wallet': _addr(block.data['dex_outgoing_transfer']['source_jetton_wallet']),
-        'destination': _addr(block.data['dex_outgoing_transfer']['destination']),
-        'destination_jetton_wallet': _addr(block.data['dex_outgoing_transfer']['destination_jetton_wallet']),
-        'asset': _addr(block.data['dex_outgoing_transfer']['asset'])
+def _convert_dex_transfer(transfer: dict) -> dict:
+    return {
+        'amount': transfer['amount'].value,
+        'source': _addr(transfer['source']),
+        'source_jetton_wallet': _addr(transfer['source_jetton_wallet']),
+        'destination': _addr(transfer['destination']),
+        'destination_jetton_wallet': _addr(transfer['destination_jetton_wallet']),
+        'asset': _addr(transfer['asset'])
     }
+
+
+def _fill_jetton_swap_action(block: JettonSwapBlock, action: Action):
+    d = block.data
+    dex = d['dex']
+    dex_incoming_transfer = _convert_dex_transfer(d['dex_incoming_transfer'])
+    dex_outgoing_transfer = _convert_dex_transfer(d['dex_outgoing_transfer'])
     action.asset = dex_incoming_transfer['asset']
     action.asset2 = dex_outgoing_transfer['asset']
-    if block.data['dex'] in ('stonfi_v2', 'dedust'):
-        action.asset = _addr(block.data['source_asset'])
-        action.asset2 = _addr(block.data['destination_asset'])
+    if dex in ('stonfi_v2', 'dedust'):
+        action.asset = _addr(d['source_asset'])
+        action.asset2 = _addr(d['destination_asset'])
     action.source = dex_incoming_transfer['source']
     action.source_secondary = dex_incoming_transfer['source_jetton_wallet']
     action.destination = dex_outgoing_transfer['destination']
     action.destination_secondary = dex_outgoing_transfer['destination_jetton_wallet']
-    if 'destination_wallet' in block.data and block.data['destination_wallet'] is not None:
-        action.destination_secondary = _addr(block.data['destination_wallet'])
-    if 'destination_asset' in block.data and block.data['destination_asset'] is not None:
-        action.asset2 = _addr(block.data['destination_asset'])
+    if 'destination_wallet' in d and d['destination_wallet'] is not None:
+        action.destination_secondary = _addr(d['destination_wallet'])
+    if 'destination_asset' in d and d['destination_asset'] is not None:
+        action.asset2 = _addr(d['destination_asset'])
 
     action.jetton_swap_data = {
-        'dex': block.data['dex'],
-        'sender': _addr(block.data['sender']),
+        'dex': dex,
+        'sender': _addr(d['sender']),
         'dex_incoming_transfer': dex_incoming_transfer,
         'dex_outgoing_transfer': dex_outgoing_transfer,
     }
-    if 'peer_swaps' in block.data and block.data['peer_swaps'] is not None:
-        action.jetton_swap_data['peer_swaps'] = [_convert_peer_swap(swap) for swap in block.data['peer_swaps']]
+    if 'peer_swaps' in d and d['peer_swaps'] is not None:
+        action.jetton_swap_data['peer_swaps'] = [_convert_peer_swap(swap) for swap in d['peer_swaps']]
 
 def _fill_dex_deposit_liquidity(block: Block, action: Action):
-    action.source = _addr(block.data['sender'])
-    action.destination = _addr(block.data['pool'])
+    d = block.data
+    action.source = _addr(d['sender'])
+    action.destination = _addr(d['pool'])
     action.dex_deposit_liquidity_data = {
-        "dex": block.data['dex'],
-        "amount1": block.data['amount_1'].value if block.data['amount_1'] is not None else None,
-        "amount2": block.data['amount_2'].value if block.data['amount_2'] is not None else None,
-        "asset1": _addr(block.data['asset_1']),
-        "asset2": _addr(block.data['asset_2']),
-        "user_jetton_wallet_1": _addr(block.data['sender_wallet_1']),
-        "user_jetton_wallet_2": _addr(block.data['sender_wallet_2']),
-        "lp_tokens_minted": block.data['lp_tokens_minted'].value if block.data['lp_tokens_minted'] is not None else None
+        "dex": d['dex'],
+        "amount1": d['amount_1'].value if d['amount_1'] is not None else None,
+        "amount2": d['amount_2'].value if d['amount_2'] is not None else None,
+        "asset1": _addr(d['asset_1']),
+        "asset2": _addr(d['asset_2']),
+        "user_jetton_wallet_1": _addr(d['sender_wallet_1']),
+        "user_jetton_wallet_2": _addr(d['sender_wallet_2']),
+        "lp_tokens_minted": d['lp_tokens_minted'].value if d['lp_tokens_minted'] is not None else None
     }
 
 def _fill_dex_withdraw_liquidity(block: Block, action: Action):
-    action.source = _addr(block.data['sender'])
-    action.source_secondary = _addr(block.data['sender_wallet'])
-    action.destination = _addr(block.data['pool'])
-    action.asset = _addr(block.data['asset'])
+    d = block.data
+    action.source = _addr(d['sender'])
+    action.source_secondary = _addr(d['sender_wallet'])
+    action.destination = _addr(d['pool'])
+    action.asset = _addr(d['asset'])
     action.dex_withdraw_liquidity_data = {
-        "dex": block.data['dex'],
-        "amount1" : block.data['amount1_out'].value if block.data['amount1_out'] is not None else None,
-        "amount2" : block.data['amount2_out'].value if block.data['amount2_out'] is not None else None,
-        'asset1_out' : _addr(block.data['asset1_out']),
-        'asset2_out' : _addr(block.data['asset2_out']),
-        'user_jetton_wallet_1' : _addr(block.data['wallet1']),
-        'user_jetton_wallet_2' : _addr(block.data['wallet2']),
-        'dex_jetton_wallet_1': _addr(block.data['dex_jetton_wallet_1']),
-        'dex_wallet_1': _addr(block.data['dex_wallet_1']),
-        'dex_wallet_2': _addr(block.data['dex_wallet_2']),
-        'dex_jetton_wallet_2': _addr(block.data['dex_jetton_wallet_2']),
-        'is_refund' : block.data['is_refund'],
-        'lp_tokens_burnt': block.data['lp_tokens_burnt'].value if block.data['lp_tokens_burnt'] is not None else None
+        "dex": d['dex'],
+        "amount1" : d['amount1_out'].value if d['amount1_out'] is not None else None,
+        "amount2" : d['amount2_out'].value if d['amount2_out'] is not None else None,
+        'asset1_out' : _addr(d['asset1_out']),
+        'asset2_out' : _addr(d['asset2_out']),
+        'user_jetton_wallet_1' : _addr(d['wallet1']),
+        'user_jetton_wallet_2' : _addr(d['wallet2']),
+        'dex_jetton_wallet_1': _addr(d['dex_jetton_wallet_1']),
+        'dex_wallet_1': _addr(d['dex_wallet_1']),
+        'dex_wallet_2': _addr(d['dex_wallet_2']),
+        'dex_jetton_wallet_2': _addr(d['dex_jetton_wallet_2']),
+        'is_refund' : d['is_refund'],
+        'lp_tokens_burnt': d['lp_tokens_burnt'].value if d['lp_tokens_burnt'] is not None else None
     }
 
 def _fill_jetton_burn_action(block: JettonBurnBlock, action: Action):
-    action.source = block.data['owner'].as_str()
-    action.source_secondary = block.data['jetton_wallet'].as_str()
-    action.asset = block.data['asset'].jetton_address.as_str()
-    action.amount = block.data['amount'].value
+    d = block.data
+    action.source = d['owner'].as_str()
+    action.source_secondary = d['jetton_wallet'].as_str()
+    action.asset = d['asset'].jetton_address.as_str()
+    action.amount = d['amount'].value
 
 
 def _fill_change_dns_record_action(block: ChangeDnsRecordBlock, action: Action):
-    action.source = block.data['source'].as_str() if block.data['source'] is not None else None
-    action.destination = block.data['destination'].as_str()
-    dns_record_data = block.data['value']
+    d = block.data
+    action.source = d['source'].as_str() if d['source'] is not None else None
+    action.destination = d['destination'].as_str()
+    dns_record_data = d['value']
     data = {
         'value_schema': dns_record_data['schema'],
         'flags': None,
         'address': None,
-        'key': block.data['key'].hex(),
+        'key': d['key'].hex(),
     }
     if data['value_schema'] in ('DNSNextResolver', 'DNSSmcAddress'):
         data['address'] = dns_record_data['address'].as_str()
@@ -278,13 +296,14 @@ def _fill_change_dns_record_action(block: ChangeDnsRecordBlock, action: Action):
 
 
 def _fill_delete_dns_record_action(block: DeleteDnsRecordBlock, action: Action):
-    action.source = block.data['source'].as_str() if block.data['source'] is not None else None
-    action.destination = block.data['destination'].as_str()
+    d = block.data
+    action.source = d['source'].as_str() if d['source'] is not None else None
+    action.destination = d['destination'].as_str()
     data = {
         'value_schema': None,
         'flags': None,
         'address': None,
-        'key': block.data['key'].hex(),
+        'key': d['key'].hex(),
     }
     action.change_dns_record_data = data
 
@@ -298,8 +317,9 @@ def _fill_tonstakers_deposit_action(block: TONStakersDepositBlock, action: Actio
     }
 
 def _fill_dns_renew_action(block: DnsRenewBlock, action: Action):
-    action.source = _addr(block.data['source'])
-    action.destination = _addr(block.data['destination'])
+    d = block.data
+    action.source = _addr(d['source'])
+    action.destination = _addr(d['destination'])
 
 def _fill_tonstakers_withdraw_request_action(block: TONStakersWithdrawRequestBlock, action: Action):
     action.source = _addr(block.data.source)
@@ -323,70 +343,77 @@ def _fill_tonstakers_withdraw_action(block: TONStakersWithdrawBlock, action: Act
     }
 
 def _fill_subscribe_action(block: SubscriptionBlock, action: Action):
-    action.source = block.data['subscriber'].as_str()
-    action.destination = block.data['beneficiary'].as_str() if block.data['beneficiary'] is not None else None
-    action.destination_secondary = block.data['subscription'].as_str()
-    action.amount = block.data['amount'].value
+    d = block.data
+    action.source = d['subscriber'].as_str()
+    action.destination = d['beneficiary'].as_str() if d['beneficiary'] is not None else None
+    action.destination_secondary = d['subscription'].as_str()
+    action.amount = d['amount'].value
 
 
 def _fill_unsubscribe_action(block: UnsubscribeBlock, action: Action):
-    action.source = block.data['subscriber'].as_str()
-    action.destination = block.data['beneficiary'].as_str() if block.data['beneficiary'] is not None else None
-    action.destination_secondary = block.data['subscription'].as_str()
+    d = block.data
+    action.source = d['subscriber'].as_str()
+    action.destination = d['beneficiary'].as_str() if d['beneficiary'] is not None else None
+    action.destination_secondary = d['subscription'].as_str()
 
 
 def _fill_election_action(block: Block, action: Action):
-    action.source = block.data['stake_holder'].as_str()
-    action.amount = block.data['amount'].value if 'amount' in block.data else None
+    d = block.data
+    action.source = d['stake_holder'].as_str()
+    action.amount = d['amount'].value if 'amount' in d else None
 
 
 def _fill_auction_bid_action(block: Block, action: Action):
-    action.source = block.data['bidder'].as_str()
-    action.destination = block.data['auction'].as_str()
-    action.asset_secondary = block.data['nft_address'].as_str()
-    action.asset = _addr(block.data['nft_collection'])
+    d = block.data
+    action.source = d['bidder'].as_str()
+    action.destination = d['auction'].as_str()
+    action.asset_secondary = d['nft_address'].as_str()
+    action.asset = _addr(d['nft_collection'])
     action.nft_transfer_data = {
-        'nft_item_index': block.data['nft_item_index'],
+        'nft_item_index': d['nft_item_index'],
     }
-    action.value = block.data['amount'].value
+    action.value = d['amount'].value
 
 def _fill_dedust_deposit_liquidity_action(block: DedustDepositLiquidity, action: Action):
+    d = block.data
     action.type='dex_deposit_liquidity'
-    action.source = _addr(block.data["sender"])
-    action.destination = _addr(block.data["pool_address"])
-    action.destination_secondary = _addr(block.data["deposit_contract"])
+    action.source = _addr(d["sender"])
+    action.destination = _addr(d["pool_address"])
+    action.destination_secondary = _addr(d["deposit_contract"])
     action.dex_deposit_liquidity_data = {
-        "dex": block.data["dex"],
-        "asset1": _addr(block.data["asset_1"].jetton_address),
-        "amount1": block.data["amount_1"].value,
-        "asset2": _addr(block.data["asset_2"].jetton_address),
-        "amount2": block.data["amount_2"].value,
-        "user_jetton_wallet_1": _addr(block.data["user_jetton_wallet_1"]),
-        "user_jetton_wallet_2": _addr(block.data["user_jetton_wallet_2"]),
-        "lp_tokens_minted": block.data["lp_tokens_minted"].value,
+        "dex": d["dex"],
+        "asset1": _addr(d["asset_1"].jetton_address),
+        "amount1": d["amount_1"].value,
+        "asset2": _addr(d["asset_2"].jetton_address),
+        "amount2": d["amount_2"].value,
+        "user_jetton_wallet_1": _addr(d["user_jetton_wallet_1"]),
+        "user_jetton_wallet_2": _addr(d["user_jetton_wallet_2"]),
+        "lp_tokens_minted": d["lp_tokens_minted"].value,
     }
 
 def _fill_dedust_deposit_liquidity_partial_action(block: DedustDepositLiquidityPartial, action: Action):
+    d = block.data
     action.type='dex_deposit_liquidity'
-    action.source = _addr(block.data["sender"])
-    action.destination_secondary = _addr(block.data["deposit_contract"])
+    action.source = _addr(d["sender"])
+    action.destination_secondary = _addr(d["deposit_contract"])
     action.dex_deposit_liquidity_data = {
-        "dex": block.data["dex"],
-        "asset1": _addr(block.data["asset_1"].jetton_address),
-        "amount1": block.data["amount_1"].value,
-        "asset2": _addr(block.data["asset_2"].jetton_address),
-        "amount2": block.data["amount_2"].value,
-        "user_jetton_wallet_1": _addr(block.data["user_jetton_wallet_1"]),
-        "user_jetton_wallet_2": _addr(block.data["user_jetton_wallet_2"]),
+        "dex": d["dex"],
+        "asset1": _addr(d["asset_1"].jetton_address),
+        "amount1": d["amount_1"].value,
+        "asset2": _addr(d["asset_2"].jetton_address),
+        "amount2": d["amount_2"].value,
+        "user_jetton_wallet_1": _addr(d["user_jetton_wallet_1"]),
+        "user_jetton_wallet_2": _addr(d["user_jetton_wallet_2"]),
         "lp_tokens_minted": None,
     }
 
 def _fill_jetton_mint_action(block: JettonMintBlock, action: Action):
-    action.destination = _addr(block.data["to"])
-    action.destination_secondary = _addr(block.data["to_jetton_wallet"])
-    action.asset = _addr(block.data["asset"].jetton_address)
-    action.amount = block.data["amount"].value if block.data["amount"] is not None else None
-    action.value = block.data["ton_amount"].value if block.data["ton_amount"] is not None else None
+    d = block.data
+    action.destination = _addr(d["to"])
+    action.destination_secondary = _addr(d["to_jetton_wallet"])
+    action.asset = _addr(d["asset"].jetton_address)
+    action.amount = d["amount"].value if d["amount"] is not None else None
+    action.value = d["ton_amount"].value if d["ton_amount"] is not None else None
 
 def _fill_nominator_pool_deposit_action(block: NominatorPoolDepositBlock, action: Action):
     action.type = 'stake_deposit'
@@ -412,6 +439,36 @@ def _fill_nominator_pool_withdraw_request_action(block: NominatorPoolWithdrawReq
 def _fill_tick_tock_action(block: Block, action: Action):
     action.source = _addr(block.data['account'])
 
+_FILLERS: dict[str, Callable[[Block, Action], None]] = {
+    'call_contract': _fill_call_contract_action,
+    'contract_deploy': _fill_call_contract_action,
+    'ton_transfer': _fill_ton_transfer_action,
+    'nominator_pool_deposit': _fill_nominator_pool_deposit_action,
+    'nominator_pool_withdraw_request': _fill_nominator_pool_withdraw_request_action,
+    'dedust_deposit_liquidity': _fill_dedust_deposit_liquidity_action,
+    'dedust_deposit_liquidity_partial': _fill_dedust_deposit_liquidity_partial_action,
+    'jetton_transfer': _fill_jetton_transfer_action,
+    'nft_transfer': _fill_nft_transfer_action,
+    'nft_mint': _fill_nft_mint_action,
+    'jetton_burn': _fill_jetton_burn_action,
+    'jetton_mint': _fill_jetton_mint_action,
+    'jetton_swap': _fill_jetton_swap_action,
+    'change_dns': _fill_change_dns_record_action,
+    'delete_dns': _fill_delete_dns_record_action,
+    'renew_dns': _fill_dns_renew_action,
+    'tonstakers_deposit': _fill_tonstakers_deposit_action,
+    'tonstakers_withdraw_request': _fill_tonstakers_withdraw_request_action,
+    'tonstakers_withdraw': _fill_tonstakers_withdraw_action,
+    'subscribe': _fill_subscribe_action,
+    'dex_deposit_liquidity': _fill_dex_deposit_liquidity,
+    'dex_withdraw_liquidity': _fill_dex_withdraw_liquidity,
+    'unsubscribe': _fill_unsubscribe_action,
+    'election_deposit': _fill_election_action,
+    'election_recover': _fill_election_action,
+    'auction_bid': _fill_auction_bid_action,
+    'tick_tock': _fill_tick_tock_action,
+}
+
 # noinspection PyCompatibility,PyTypeChecker
 def block_to_action(block: Block, trace_id: str, trace: Trace | None = None) -> Action:
     action = _base_block_to_action(block, trace_id)
@@ -420,59 +477,11 @@ def block_to_action(block: Block, trace_id: str, trace: Trace | None = None) ->
         action.trace_end_utime = trace.end_utime
         action.trace_external_hash = trace.external_hash
         action.trace_mc_seqno_end = trace.mc_seqno_end
-    match block.btype:
-        case 'call_contract' | 'contract_deploy':
-            _fill_call_contract_action(block, action)
-        case 'ton_transfer':
-            _fill_ton_transfer_action(block, action)
-        case "nominator_pool_deposit":
-            _fill_nominator_pool_deposit_action(block, action)
-        case "nominator_pool_withdraw_request":
-            _fill_nominator_pool_withdraw_request_action(block, action)
-        case "dedust_deposit_liquidity":
-            _fill_dedust_deposit_liquidity_action(block, action)
-        case "dedust_deposit_liquidity_partial":
-            _fill_dedust_deposit_liquidity_partial_action(block, action)
-        case "jetton_transfer":
-            _fill_jetton_transfer_action(block, action)
-        case 'nft_transfer':
-            _fill_nft_transfer_action(block, action)
-        case 'nft_mint':
-            _fill_nft_mint_action(block, action)
-        case 'jetton_burn':
-            _fill_jetton_burn_action(block, action)
-        case "jetton_mint":
-            _fill_jetton_mint_action(block, action)
-        case "jetton_swap":
-            _fill_jetton_swap_action(block, action)
-        case 'change_dns':
-            _fill_change_dns_record_action(block, action)
-        case 'delete_dns':
-            _fill_delete_dns_record_action(block, action)
-        case 'renew_dns':
-            _fill_dns_renew_action(block, action)
-        case "tonstakers_deposit":
-            _fill_tonstakers_deposit_action(block, action)
-        case "tonstakers_withdraw_request":
-            _fill_tonstakers_withdraw_request_action(block, action)
-        case "tonstakers_withdraw":
-            _fill_tonstakers_withdraw_action(block, action)
-        case "subscribe":
-            _fill_subscribe_action(block, action)
-        case 'dex_deposit_liquidity':
-            _fill_dex_deposit_liquidity(block, action)
-        case 'dex_withdraw_liquidity':
-            _fill_dex_withdraw_liquidity(block, action)
-        case 'unsubscribe':
-            _fill_unsubscribe_action(block, action)
-        case 'election_deposit' | 'election_recover':
-            _fill_election_action(block, action)
-        case 'auction_bid':
-            _fill_auction_bid_action(block, action)
-        case 'tick_tock':
-            _fill_tick_tock_action(block, action)
-        case _:
-            logger.warning(f"Unknown block type {block.btype} for trace {trace_id}")
+    filler = _FILLERS.get(block.btype)
+    if filler is not None:
+        filler(block, action)
+    else:
+        logger.warning(f"Unknown block type {block.btype} for trace {trace_id}")
     # Fill accounts
     action._accounts.append(action.source)
     action._accounts.append(action.source_secondary)
@@ -480,9 +489,9 @@ def block_to_action(block: Block, trace_id: str, trace: Trace | None = None) ->
     action._accounts.append(action.destination_secondary)
 
     # Fill extended tx hashes
-    extended_tx_hashes = set(action.tx_hashes)
+    extended_tx_hashes = dict.fromkeys(action.tx_hashes)
     if block.initiating_event_node is not None:
-        extended_tx_hashes.add(block.initiating_event_node.get_tx_hash())
+        extended_tx_hashes[block.initiating_event_node.get_tx_hash()] = None
         if not block.initiating_event_node.is_tick_tock:
             acc = block.initiating_event_node.message.transaction.account
             if acc not in action._accounts:
@@ -1,38 +1,86 @@
 from __future__ import annotations
 
-import base64
+from typing import Any
 
-import msgpack
+import msgspec
+from pybase64 import b64encode
 
 from indexer.core.database import MessageContent, Transaction, Message, Trace, TraceEdge
+from indexer.events.blocks.utils.address_selectors import extract_message_additional_addresses
 
 account_status_map = ['uninit', 'frozen', 'active', 'nonexist']
+acc_status_change_map = ['unchanged', 'frozen', 'deleted']
 
 
-def _message_from_tuple(tx: Transaction, data, direction: str) -> Message:
-    message_content = MessageContent(hash='', body=data['body_boc'])
+# Schemas of the trace nodes written to Redis by ton-trace-emulator (see Serializer.hpp there).
+# The emulator packs structs as maps, so fields are matched by name.
+class _MessagePayload(msgspec.Struct):
+    hash: bytes
+    source: str | None
+    destination: str | None
+    value: int | None
+    fwd_fee: int | None
+    ihr_fee: int | None
+    created_lt: int | None
+    created_at: int | None
+    opcode: int | None
+    ihr_disabled: bool | None
+    bounce: bool | None
+    bounced: bool | None
+    import_fee: int | None
+    body_boc: str
+    init_state_boc: str | None
+
+
+class _TransactionPayload(msgspec.Struct):
+    hash: bytes
+    account: str
+    lt: int
+    prev_trans_hash: bytes
+    prev_trans_lt: int
+    now: int
+    orig_status: int
+    end_status: int
+    in_msg: _MessagePayload | None
+    out_msgs: list[_MessagePayload]
+    total_fees: int
+    account_state_hash_before: bytes
+    account_state_hash_after: bytes
+    description: dict[str, Any]
+
+
+class _TraceNodePayload(msgspec.Struct):
+    transaction: _TransactionPayload
+    emulated: bool
+
+
+_trace_node_decoder = msgspec.msgpack.Decoder(_TraceNodePayload)
+
+
+def _message_from_payload(tx: Transaction, data: _MessagePayload, direction: str) -> Message:
+    message_content = MessageContent(hash='', body=data.body_boc)
     message = Message(
-        msg_hash=base64.b64encode(data['hash']).decode(),
+        msg_hash=b64encode(data.hash).decode(),
         tx_hash=tx.hash,
         tx_lt=tx.lt,
-        source=data['source'],
-        destination=data['destination'],
+        source=data.source,
+        destination=data.destination,
         direction=direction,
-        value=data['value'],
-        fwd_fee=data['fwd_fee'],
-        ihr_fee=data['ihr_fee'],
-        created_lt=data['created_lt'],
-        created_at=data['created_at'],
-        opcode=data['opcode'],
-        ihr_disabled=data['ihr_disabled'],
-        bounce=data['bounce'],
-        bounced=data['bounced'],
-        import_fee=data['import_fee'],
+        value=data.value,
+        fwd_fee=data.fwd_fee,
+        ihr_fee=data.ihr_fee,
+        created_lt=data.created_lt,
+        created_at=data.created_at,
+        opcode=data.opcode,
+        ihr_disabled=data.ihr_disabled,
+        bounce=data.bounce,
+        bounced=data.bounced,
+        import_fee=data.import_fee,
         message_content=message_content,
         transaction=tx,
     )
-    if data['init_state_boc'] is not None:
-        message.init_state = MessageContent(hash='', body=data['init_state_boc'])
+    if data.init_state_boc is not None:
+        message.init_state = MessageContent(hash='', body=data.init_state_boc)
     return message
 
 def fill_tx_description(tx: Transaction, data):
@@ -41,39 +89,33 @@ def fill_tx_description(tx: Transaction, data):
     tx.aborted = data['aborted']
     tx.bounce = data['bounce']
     tx.destroyed = data['destroyed']
-    if data.get('storage_ph') is not None:
-        tx.storage_fees_collected = data['storage_ph']['storage_fees_collected']
-        tx.storage_fees_due = data['storage_ph']['storage_fees_due']
-    match data['storage_ph']['status_change']:
-        case 0:
-            tx.storage_fees_change = 'unchanged'
-        case 1:
-            tx.storage_fees_change = 'frozen'
-        case 2:
-            tx.storage_fees_change = 'deleted'
-    if data.get('credit_ph') is not None:
-        tx.due_fees_collected = data['credit_ph']['due_fees_collected']
-        tx.credit = data['credit_ph']['credit']
+    storage_ph = data.get('storage_ph')
+    if storage_ph is not None:
+        tx.storage_fees_collected = storage_ph['storage_fees_collected']
+        tx.storage_fees_due = storage_ph['storage_fees_due']
+        tx.storage_fees_change = acc_status_change_map[storage_ph['status_change']]
+    credit_ph = data.get('credit_ph')
+    if credit_ph is not None:
+        tx.due_fees_collected = credit_ph['due_fees_collected']
+        tx.credit = credit_ph['credit']
     compute_ph_type, compute_ph = data['compute_ph']
-    match compute_ph_type:
-        case 0:
-            tx.compute_skipped = True
-            tx.skipped_reason = compute_ph['reason']
-        case 1:
-            tx.compute_mode = 'vm'
-            tx.compute_success = compute_ph['success']
-            tx.compute_msg_state_used = compute_ph['msg_state_used']
-            tx.compute_account_activated = compute_ph['account_activated']
-            tx.compute_gas_fees = compute_ph['gas_fees']
-            tx.compute_gas_used = compute_ph['gas_used']
-            tx.compute_gas_limit = compute_ph['gas_limit']
-            tx.compute_gas_credit = compute_ph['gas_credit']
-            tx.compute_mode = compute_ph['mode']
-            tx.compute_exit_code = compute_ph['exit_code']
-            tx.compute_exit_arg = compute_ph['exit_arg']
-            tx.compute_vm_steps = compute_ph['vm_steps']
-            tx.compute_vm_init_state_hash = compute_ph['vm_init_state_hash']
-            tx.compute_vm_final_state_hash = compute_ph['vm_final_state_hash']
+    if compute_ph_type == 0:
+        tx.compute_skipped = True
+        tx.skipped_reason = compute_ph['reason']
+    elif compute_ph_type == 1:
+        tx.compute_success = compute_ph['success']
+        tx.compute_msg_state_used = compute_ph['msg_state_used']
+        tx.compute_account_activated = compute_ph['account_activated']
+        tx.compute_gas_fees = compute_ph['gas_fees']
+        tx.compute_gas_used = compute_ph['gas_used']
+        tx.compute_gas_limit = compute_ph['gas_limit']
+        tx.compute_gas_credit = compute_ph['gas_credit']
+        tx.compute_mode = compute_ph['mode']
+        tx.compute_exit_code = compute_ph['exit_code']
+        tx.compute_exit_arg = compute_ph['exit_arg']
+        tx.compute_vm_steps = compute_ph['vm_steps']
+        tx.compute_vm_init_state_hash = compute_ph['vm_init_state_hash']
+        tx.compute_vm_final_state_hash = compute_ph['vm_final_state_hash']
     action = data['action']
     if action is not None:
         tx.action_success = action['success']
@@ -89,55 +131,85 @@ def fill_tx_description(tx: Transaction, data):
         tx.action_skipped_actions = action['skipped_actions']
         tx.action_msgs_created = action['msgs_created']
         tx.action_action_list_hash = action['action_list_hash']
-        tx.action_tot_msg_size_cells = action['tot_msg_size']['cells']
-        tx.action_tot_msg_size_bits = action['tot_msg_size']['bits']
+        tot_msg_size = action['tot_msg_size']
+        tx.action_tot_msg_size_cells = tot_msg_size['cells']
+        tx.action_tot_msg_size_bits = tot_msg_size['bits']
 
-def unpack_messagepack_tx(data: bytes) -> Transaction:
-    decoded_data = msgpack.unpackb(data, raw=False)
-    tx_data = decoded_data['transaction']
+def _transaction_from_payload(node: _TraceNodePayload) -> Transaction:
+    tx_data = node.transaction
     tx = Transaction(
-        lt=tx_data['lt'],
-        hash=base64.b64encode(tx_data['hash']).decode(),
-        prev_trans_hash=base64.b64encode(tx_data['prev_trans_hash']).decode(),
-        prev_trans_lt=tx_data['prev_trans_lt'],
-        account=tx_data['account'],
-        now=tx_data['now'],
+        lt=tx_data.lt,
+        hash=b64encode(tx_data.hash).decode(),
+        prev_trans_hash=b64encode(tx_data.prev_trans_hash).decode(),
+        prev_trans_lt=tx_data.prev_trans_lt,
+        account=tx_data.account,
+        now=tx_data.now,
         mc_block_seqno=0,
-        orig_status=account_status_map[tx_data['orig_status']],
-        end_status=account_status_map[tx_data['end_status']],
-        total_fees=tx_data['total_fees'],
-        account_state_hash_before=base64.b64encode(tx_data['account_state_hash_before']).decode(),
-        account_state_hash_after=base64.b64encode(tx_data['account_state_hash_after']).decode(),
-        emulated=decoded_data['emulated']
+        orig_status=account_status_map[tx_data.orig_status],
+        end_status=account_status_map[tx_data.end_status],
+        total_fees=tx_data.total_fees,
+        account_state_hash_before=b64encode(tx_data.account_state_hash_before).decode(),
+        account_state_hash_after=b64encode(tx_data.account_state_hash_after).decode(),
+        emulated=node.emulated
     )
-    fill_tx_description(tx, tx_data['description'])
-    tx.messages = [_message_from_tuple(tx, msg, 'out') for msg in tx_data['out_msgs']] + [
-        _message_from_tuple(tx, tx_data['in_msg'], 'in')]
+    fill_tx_description(tx, tx_data.description)
+    tx.messages = [_message_from_payload(tx, msg, 'out') for msg in tx_data.out_msgs] + [
+        _message_from_payload(tx, tx_data.in_msg, 'in')]
     return tx
 
 
-def deserialize_event(trace_id, packed_transactions_map: dict[str, bytes]) -> Trace:
-    edges = []
-    transactions = []
+def unpack_messagepack_tx(data: bytes) -> Transaction:
+    return _transaction_from_payload(_trace_node_decoder.decode(data))
+
+
+def _pending_children(tx: Transaction,
+                      packed_transactions_map: dict[str, bytes]) -> list[tuple[Transaction, Message, Transaction]]:
+    """Decodes the child transactions of tx.
+
+    Returns (parent tx, out message, child tx) triples reversed, so that popping from a stack keeps their order."""
+    return [(tx, msg, unpack_messagepack_tx(packed_transactions_map[msg.msg_hash]))
+            for msg in reversed(tx.messages) if msg.direction == 'out' and msg.destination is not None]
+
+
+def _find_root(trace_id, packed_transactions_map: dict[str, bytes]) -> bytes:
     try:
         if trace_id in packed_transactions_map:
-            root = packed_transactions_map[trace_id]
+            return packed_transactions_map[trace_id]
         else:
-            root = packed_transactions_map[base64.b64encode(bytes.fromhex(trace_id)).decode()]
+            return packed_transactions_map[b64encode(bytes.fromhex(trace_id)).decode()]
     except Exception:
         raise ValueError(f"Root tx not found for trace '{trace_id}'")
 
-    def load_leaf(tx):
-        for msg in tx.messages:
-            if msg.direction != 'out' or msg.destination is None:
-                continue
-            child_tx = unpack_messagepack_tx(packed_transactions_map[msg.msg_hash])
-            edges.append(TraceEdge(left_tx=tx.hash, right_tx=child_tx.hash, msg_hash=msg.msg_hash, trace_id=trace_id))
-            transactions.append(child_tx)
-            load_leaf(child_tx)
 
-    root_tx = unpack_messagepack_tx(root)
+def collect_trace_accounts(trace_id, packed_transactions_map: dict[str, bytes]) -> set[str]:
+    """Collects the accounts of the trace transactions and the addresses referenced by their messages.
+
+    Reads the decoded payloads directly, so no models are built as in deserialize_event."""
+    accounts = set()
+    stack = [_trace_node_decoder.decode(_find_root(trace_id, packed_transactions_map))]
+    while stack:
+        tx_data = stack.pop().transaction
+        accounts.add(tx_data.account)
+        for msg in tx_data.out_msgs:
+            accounts.update(extract_message_additional_addresses(msg.opcode, msg.body_boc))
+            if msg.destination is not None:
+                stack.append(_trace_node_decoder.decode(packed_transactions_map[b64encode(msg.hash).decode()]))
+        if tx_data.in_msg is not None:
+            accounts.update(extract_message_additional_addresses(tx_data.in_msg.opcode, tx_data.in_msg.body_boc))
+    return accounts
+
+
+def deserialize_event(trace_id, packed_transactions_map: dict[str, bytes]) -> Trace:
+    edges = []
+    transactions = []
+    root_tx = unpack_messagepack_tx(_find_root(trace_id, packed_transactions_map))
     transactions.append(root_tx)
-    load_leaf(root_tx)
+    # (parent tx, out message, child tx) work stack, walks the trace in the same depth-first order as recursion would
+    stack = _pending_children(root_tx, packed_transactions_map)
+    while stack:
+        tx, msg, child_tx = stack.pop()
+        edges.append(TraceEdge(left_tx=tx.hash, right_tx=child_tx.hash, msg_hash=msg.msg_hash, trace_id=trace_id))
+        transactions.append(child_tx)
+        stack.extend(_pending_children(child_tx, packed_transactions_map))
     return Trace(transactions=transactions, trace_id=trace_id, classification_state='unclassified',
                  state='complete', start_lt=root_tx.lt)
@@ -44,7 +44,10 @@ def is_failed(tx: Transaction):
 
 
 class AccountId:
+    __slots__ = ('address', '_str')
+
     def __init__(self, address: str | Address | ExternalAddress | None):
+        self._str = None
         if address is None:
             self.address = None
         elif isinstance(address, ExternalAddress):
@@ -72,9 +75,10 @@ class AccountId:
         return self.address.wc.to_bytes(32, byteorder="big", signed=True) + self.address.hash_part
 
     def as_str(self):
-        if self.address is None:
-            return None
-        return self.address.to_str(False).upper()
+        # the same address is usually formatted several times per trace, so the result is cached
+        if self._str is None and self.address is not None:
+            self._str = self.address.to_str(False).upper()
+        return self._str
 
     def to_json(self):
         return self.as_str()